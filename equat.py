@@ -4,9 +4,16 @@ Created on Sun Jan  8 10:52:07 2017
 
 @author: Алексей
 """
+import math
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+try:
+    import fdint    # optional, C implementation of the Fermi-Dirac integrals
+except ImportError:
+    fdint = None
+
 def varshni(temp, eg, a, b):
     """
     Varshni equation for the temperature-dependent band gap
@@ -16,13 +23,113 @@ def varshni(temp, eg, a, b):
     a - alpha constant [eV/K]
     b - beta constant [K]
     
+    temp may be a float or an array of temperatures, the result has the
+    same shape as temp
+
     returns energy [eV]
     """
-    
-    return (eg - a * temp**2 / (temp + b))
-    
+    temp = np.asarray(temp, dtype=np.float64)
+    temp_sq = temp * temp
+    return (eg - a * temp_sq / (temp + b))
+
+
+def varshni_many(temps, egs, alphas, betas):
+    """
+    Varshni equation evaluated for several materials and temperatures at once
+
+    temps - absolute temperatures, 1d array of length T [K]
+    egs - band gaps at T = 0 K, 1d array of length M [eV]
+    alphas - alpha constants, 1d array of length M [eV/K]
+    betas - beta constants, 1d array of length M [K]
+
+    returns energy, ndarray of shape (M, T) [eV]
+    """
+    temps = np.asarray(temps, dtype=np.float64).reshape(1, -1)
+    egs = np.asarray(egs, dtype=np.float64).reshape(-1, 1)
+    alphas = np.asarray(alphas, dtype=np.float64).reshape(-1, 1)
+    betas = np.asarray(betas, dtype=np.float64).reshape(-1, 1)
+    return (egs - alphas * temps * temps / (temps + betas))
 
-def fermi_dirac_1d(x):
+
+# Coefficients of the Antia rational approximations for the Fermi-Dirac integrals,
+# stored in descending order of power for the Horner scheme
+_FD1_LO_NUM = (1.0, 1.98276889924768e+3, 1.14980998186874e+5, 1.83696370756153e+6, 1.14587609192151e+7,
+               3.16743385304962e+7, 3.88148302324068e+7, 1.71446374704454e+7)
+_FD1_LO_DEN = (4.35061725080755e+2, 3.13595854332114e+4, 6.13709569333207e+5, 4.81648022267831e+6,
+               1.77657027846367e+7, 3.26070130734158e+7, 2.87386436731785e+7, 9.67282587452899e+6)
+_FD1_HI_NUM = (1.0, 2.98435207466372, -7.45519953763928e-1, -8.52408612877447e-1, -1.60926102124442e-1,
+               -1.12295393687006e-2, -3.69976170193942e-4, -6.64932238528105e-6, -6.84738791621745e-8,
+               -4.44467627042232e-10, -1.58654991146236e-12, -4.46620341924942e-15)
+_FD1_HI_DEN = (4.16485970495288e-1, 1.86795964993052, -4.99759250374148e-1, -4.78770844009440e-1,
+               -8.34904593067194e-2, -5.69764436880529e-3, -1.86432212187088e-4, -3.33919612678907e-6,
+               -3.43299431079845e-08, -2.22564376956228e-10, -7.94193282071464e-13, -2.23310170962369e-15)
+
+_FD3_LO_NUM = (1.0, 7.77238678539648e+2, 4.16031909245777e+4, 6.42493233715640e+5, 3.93536421893014e+6,
+               1.07608632249013e+7, 1.30964880355883e+7, 5.75834152995465e+6)
+_FD3_LO_DEN = (9.02129136642157e+1, 8.17922106644547e+3, 1.95155948326832e+5, 1.83167424554505e+6,
+               7.95192647756086e+6, 1.69288134856160e+7, 1.70750501625775e+7, 6.49759261942269e+6)
+_FD3_HI_NUM = (1.0, 1.91247528779676, 1.08037861921488, 2.48653216266227e-1, 2.60768398973913e-2,
+               1.32212995937796e-3, 3.40679845803144e-5, 4.69233883900644e-7, 3.76794942277806e-9,
+               1.64429113030738e-11, 4.85378381173415e-14)
+_FD3_HI_DEN = (-2.14562434782759e-2, 2.01311836975930e-1, 1.34981244060549, 1.16434871200131,
+               3.24095226486468e-1, 3.66887808002874e-2, 1.92040136756592e-3, 5.02360015186394e-5,
+               6.96888634549649e-7, 5.62152894375277e-9, 2.45745452167585e-11, 7.28067571760518e-14)
+
+# Constants of the Aymerich-Humet approximation for the Fermi-Dirac integral of order 1/2
+_AH3_A = (1 + 15 / 4 * 1.5 + 1.5 * 1.5 / 40) ** 0.5
+_AH3_B = 1.8 + 0.61 * 0.5
+_AH3_C = 2 + (2 - 2 ** 0.5) * 2 ** -0.5
+_AH3_GAMMA = math.gamma(1.5)
+
+# methods of the Fermi-Dirac integrals calculation available for the orders -1/2 and 1/2
+_METHODS_1D = ('antia', 'fdint')
+_METHODS_3D = ('antia', 'fdint', 'aymerich')
+
+
+def _make_horner(coef, name):
+    """
+    Generates polynomial function with the coefficients inlined into the Horner scheme,
+    straight-line code without loop works faster than the loop over coefficients
+    :param coef: tuple of coefficients in descending order of power
+    :param name: String name of the generated function
+    :return: function of one variable y (float or ndarray), polynomial value
+    """
+    expr = repr(coef[0])
+    for c in coef[1:]:
+        expr = '(%s) * y + %r' % (expr, c)
+    namespace = {}
+    exec(compile('def %s(y):\n    return %s\n' % (name, expr), '<%s>' % name, 'exec'), namespace)
+    return namespace[name]
+
+
+_fd1_lo_num = _make_horner(_FD1_LO_NUM, '_fd1_lo_num')
+_fd1_lo_den = _make_horner(_FD1_LO_DEN, '_fd1_lo_den')
+_fd1_hi_num = _make_horner(_FD1_HI_NUM, '_fd1_hi_num')
+_fd1_hi_den = _make_horner(_FD1_HI_DEN, '_fd1_hi_den')
+_fd3_lo_num = _make_horner(_FD3_LO_NUM, '_fd3_lo_num')
+_fd3_lo_den = _make_horner(_FD3_LO_DEN, '_fd3_lo_den')
+_fd3_hi_num = _make_horner(_FD3_HI_NUM, '_fd3_hi_num')
+_fd3_hi_den = _make_horner(_FD3_HI_DEN, '_fd3_hi_den')
+
+
+def _check_method(method, methods):
+    """
+    Raises ValueError if method is not one of the available methods
+    """
+    if method not in methods:
+        raise ValueError('unknown method %r, available methods: %s' % (method, ', '.join(methods)))
+
+
+def _fdk(k, x):
+    """
+    Fermi-Dirac integral of order k calculated by the fdint package
+    """
+    if fdint is None:
+        raise ImportError("method 'fdint' requires the fdint package")
+    return fdint.fdk(k, x)
+
+
+def fermi_dirac_1d(x, method='antia'):
     """
     UNCHECKED!!!
     Fermi-Dirac integral for the 1d density of states (order -1/2)
@@ -30,57 +137,116 @@ def fermi_dirac_1d(x):
     Astrophysical Journal Supplement 84 (1993), 101–108"
     Relative error is 10^-12 according to author
     :param x: float, variable
+    :param method: 'antia' (default) - this approximation,
+    'fdint' - C implementation from the optional fdint package
     :return: float, integral value
     """
+    _check_method(method, _METHODS_1D)
+    if method == 'fdint':
+        return _fdk(-0.5, x)
     if x < 2:
         y = np.exp(x)
-        numerator = [1.71446374704454e+7, 3.88148302324068e+7, 3.16743385304962e+7, 1.14587609192151e+7,
-                     1.83696370756153e+6, 1.14980998186874e+5, 1.98276889924768e+3, 1.0]
-        denominator = [9.67282587452899e+6, 2.87386436731785e+7, 3.26070130734158e+7, 1.77657027846367e+7,
-                       4.81648022267831e+6, 6.13709569333207e+5, 3.13595854332114e+4, 4.35061725080755e+2]
-        return y * np.polynomial.Polynomial(numerator)(y) / np.polynomial.Polynomial(denominator)(y)
+        return y * _fd1_lo_num(y) / _fd1_lo_den(y)
     else:
         y = 1 / x**2
-        numerator = [-4.46620341924942e-15, -1.58654991146236e-12, -4.44467627042232e-10, -6.84738791621745e-8,
-                     -6.64932238528105e-6, -3.69976170193942e-4, -1.12295393687006e-2, -1.60926102124442e-1,
-                     -8.52408612877447e-1, -7.45519953763928e-1, 2.98435207466372, 1.0]
-        denominator = [-2.23310170962369e-15, -7.94193282071464e-13, -2.22564376956228e-10, -3.43299431079845e-08,
-                       -3.33919612678907e-6, -1.86432212187088e-4, -5.69764436880529e-3, -8.34904593067194e-2,
-                       -4.78770844009440e-1, -4.99759250374148e-1, 1.86795964993052, 4.16485970495288e-1]
-        return np.sqrt(x) * np.polynomial.Polynomial(numerator)(y) / np.polynomial.Polynomial(denominator)(y)
+        return np.sqrt(x) * _fd1_hi_num(y) / _fd1_hi_den(y)
 
 
-def fermi_dirac_3d(x):
+def fermi_dirac_3d(x, method='antia'):
     """
     Fermi-Dirac integral for the 3d density of states (order 1/2)
     Rational-form approximation from "H. M. Antia, Rational Function Approximations for Fermi–Dirac Integrals,
     Astrophysical Journal Supplement 84 (1993), 101–108"
     Relative error is 10^-12 according to author
     :param x: float, variable
+    :param method: 'antia' (default) - this approximation,
+    'fdint' - C implementation from the optional fdint package,
+    'aymerich' - faster approximation fermi_dirac_3d_fast
     :return: float, integral value
     """
+    _check_method(method, _METHODS_3D)
+    if method == 'aymerich':
+        return fermi_dirac_3d_fast(x)
+    if method == 'fdint':
+        return _fdk(0.5, x)
     if x < 2:
         y = np.exp(x)
-        numerator = [5.75834152995465e+6, 1.30964880355883e+7, 1.07608632249013e+7, 3.93536421893014e+6,
-                     6.42493233715640e+5, 4.16031909245777e+4, 7.77238678539648e+2, 1.0]
-        denominator = [6.49759261942269e+6, 1.70750501625775e+7, 1.69288134856160e+7, 7.95192647756086e+6,
-                       1.83167424554505e+6, 1.95155948326832e+5, 8.17922106644547e+3, 9.02129136642157e+1]
-        return y * np.polynomial.Polynomial(numerator)(y) / np.polynomial.Polynomial(denominator)(y)
+        return y * _fd3_lo_num(y) / _fd3_lo_den(y)
     else:
         y = 1 / x**2
-        numerator = [4.85378381173415e-14, 1.64429113030738e-11, 3.76794942277806e-9, 4.69233883900644e-7,
-                     3.40679845803144e-5, 1.32212995937796e-3, 2.60768398973913e-2, 2.48653216266227e-1,
-                     1.08037861921488, 1.91247528779676, 1.0]
-        denominator = [7.28067571760518e-14, 2.45745452167585e-11, 5.62152894375277e-9, 6.96888634549649e-7,
-                       5.02360015186394e-5, 1.92040136756592e-3, 3.66887808002874e-2, 3.24095226486468e-1,
-                       1.16434871200131, 1.34981244060549, 2.01311836975930e-1, -2.14562434782759e-2]
-        return x * np.sqrt(x) * np.polynomial.Polynomial(numerator)(y) / np.polynomial.Polynomial(denominator)(y)
+        return x * np.sqrt(x) * _fd3_hi_num(y) / _fd3_hi_den(y)
+
+
+def fermi_dirac_1d_vec(x, method='antia'):
+    """
+    Vectorized version of fermi_dirac_1d (order -1/2)
+    Both branches of the approximation are evaluated for the whole array
+    and the result is selected element-wise
+    :param x: array_like, variable
+    :param method: 'antia' (default) - this approximation,
+    'fdint' - C implementation from the optional fdint package
+    :return: ndarray, integral values
+    """
+    x = np.asarray(x, dtype=np.float64)
+    _check_method(method, _METHODS_1D)
+    if method == 'fdint':
+        return _fdk(-0.5, x)
+    mask = x < 2
+    y_lo = np.exp(np.where(mask, x, 0.0))
+    x_hi = np.where(mask, 2.0, x)
+    y_hi = 1 / (x_hi * x_hi)
+    lo = y_lo * _fd1_lo_num(y_lo) / _fd1_lo_den(y_lo)
+    hi = np.sqrt(x_hi) * _fd1_hi_num(y_hi) / _fd1_hi_den(y_hi)
+    return np.where(mask, lo, hi)
+
+
+def fermi_dirac_3d_vec(x, method='antia'):
+    """
+    Vectorized version of fermi_dirac_3d (order 1/2)
+    Both branches of the approximation are evaluated for the whole array
+    and the result is selected element-wise
+    :param x: array_like, variable
+    :param method: 'antia' (default) - this approximation,
+    'fdint' - C implementation from the optional fdint package,
+    'aymerich' - faster approximation fermi_dirac_3d_fast
+    :return: ndarray, integral values
+    """
+    _check_method(method, _METHODS_3D)
+    if method == 'aymerich':
+        return fermi_dirac_3d_fast(x)
+    if method == 'fdint':
+        return _fdk(0.5, np.asarray(x, dtype=np.float64))
+    x = np.asarray(x, dtype=np.float64)
+    mask = x < 2
+    y_lo = np.exp(np.where(mask, x, 0.0))
+    x_hi = np.where(mask, 2.0, x)
+    y_hi = 1 / (x_hi * x_hi)
+    lo = y_lo * _fd3_lo_num(y_lo) / _fd3_lo_den(y_lo)
+    hi = x_hi * np.sqrt(x_hi) * _fd3_hi_num(y_hi) / _fd3_hi_den(y_hi)
+    return np.where(mask, lo, hi)
+
+
+def fermi_dirac_3d_fast(x):
+    """
+    Fermi-Dirac integral for the 3d density of states (order 1/2), same normalization as fermi_dirac_3d
+    Single-formula approximation from "X. Aymerich-Humet, F. Serra-Mestres, J. Millan,
+    An analytical approximation for the Fermi-Dirac integral F3/2(eta), Solid-State Electronics 24 (1981), 981-982"
+    generalized for the order 1/2, relative error is below 1% for all x
+    :param x: float or array_like, variable
+    :return: float or ndarray, integral value
+    """
+    x = np.asarray(x, dtype=np.float64)
+    denom = _AH3_B + x + (np.abs(x - _AH3_B) ** _AH3_C + _AH3_A ** _AH3_C) ** (1 / _AH3_C)
+    deg = 1.5 * 2 ** 1.5 * denom ** -1.5
+    # exp(-|x|) does not overflow: the formula is multiplied by exp(x) / exp(x) for x < 0
+    e = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1 / (deg + e / _AH3_GAMMA), e / (e * deg + 1 / _AH3_GAMMA))
 
 
 if __name__ == '__main__':
-    x = [i*0.01 for i in range(-700, 700)]
-    y = [fermi_dirac_3d(i) for i in x]
-    z = np.exp(x) * np.sqrt(np.pi) / 2
+    x = np.arange(-7.0, 7.0, 0.01)
+    y = fermi_dirac_3d_vec(x)
+    z = np.exp(x) * np.sqrt(np.pi) * 0.5
     plt.plot(x, z)
     plt.plot(x, y)
     plt.yscale('log')
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Numba-compiled kernels for the inner simulation loops:
+1) Fermi-Dirac integrals from equat.py. Functions have the same names as in equat.py and
+always use the Antia approximation, they take only the variable x (no method argument)
+and can replace the equat.py functions called with the default method
+2) alloy_band - band energy of the alloy with bowing, used by the alloy classes of structure.py
+"""
+import math
+
+import numpy as np
+from numba import njit, prange
+
+from equat import (_FD1_LO_NUM, _FD1_LO_DEN, _FD1_HI_NUM, _FD1_HI_DEN,
+                   _FD3_LO_NUM, _FD3_LO_DEN, _FD3_HI_NUM, _FD3_HI_DEN)
+
+
+@njit(cache=True, fastmath=True)
+def _horner(coef, y):
+    """
+    Evaluates polynomial with the Horner scheme
+    :param coef: tuple of coefficients in descending order of power
+    :param y: float, variable
+    :return: float, polynomial value
+    """
+    res = coef[0]
+    for i in range(1, len(coef)):
+        res = res * y + coef[i]
+    return res
+
+
+@njit(cache=True, fastmath=True)
+def fermi_dirac_1d(x):
+    """
+    UNCHECKED!!!
+    Fermi-Dirac integral for the 1d density of states (order -1/2), see equat.fermi_dirac_1d
+    :param x: float, variable
+    :return: float, integral value
+    """
+    if x < 2:
+        y = math.exp(x)
+        return y * _horner(_FD1_LO_NUM, y) / _horner(_FD1_LO_DEN, y)
+    else:
+        y = 1 / (x * x)
+        return math.sqrt(x) * _horner(_FD1_HI_NUM, y) / _horner(_FD1_HI_DEN, y)
+
+
+@njit(cache=True, fastmath=True)
+def fermi_dirac_3d(x):
+    """
+    Fermi-Dirac integral for the 3d density of states (order 1/2), see equat.fermi_dirac_3d
+    :param x: float, variable
+    :return: float, integral value
+    """
+    if x < 2:
+        y = math.exp(x)
+        return y * _horner(_FD3_LO_NUM, y) / _horner(_FD3_LO_DEN, y)
+    else:
+        y = 1 / (x * x)
+        return x * math.sqrt(x) * _horner(_FD3_HI_NUM, y) / _horner(_FD3_HI_DEN, y)
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def fermi_dirac_1d_vec(x):
+    """
+    Parallel version of fermi_dirac_1d for 1d array of variables
+    :param x: 1d ndarray of float, variable
+    :return: ndarray, integral values
+    """
+    res = np.empty(x.size)
+    for i in prange(x.size):
+        res[i] = fermi_dirac_1d(x[i])
+    return res
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def fermi_dirac_3d_vec(x):
+    """
+    Parallel version of fermi_dirac_3d for 1d array of variables
+    :param x: 1d ndarray of float, variable
+    :return: ndarray, integral values
+    """
+    res = np.empty(x.size)
+    for i in prange(x.size):
+        res[i] = fermi_dirac_3d(x[i])
+    return res
+
+
+@njit(parallel=True, cache=True)
+def alloy_band(x, en1, en2, bow, shift):
+    """
+    Band energy position of the alloy of two semiconductors with bowing for the array of contents
+    :param x: 1d ndarray of float, content of the first semiconductor
+    :param en1, en2: float, band energy positions of the pure semiconductors 1 and 2 [eV]
+    :param bow: float, bowing parameter [eV]
+    :param shift: float, energy shift of the band [eV]
+    :return: ndarray, band energy positions [eV]
+    """
+    res = np.empty(x.size)
+    for i in prange(x.size):
+        res[i] = x[i] * en1 + (1 - x[i]) * en2 - x[i] * (1 - x[i]) * bow + shift
+    return res
@@ -3,30 +3,66 @@
 Interaction between Python and Nextnano3 simulation program
 """
 
+from pathlib import Path
+
 import numpy as np
 
 
+def _read_text(file_name):
+    """
+    Parses the Nextnano output text file into ndarray of floats
+    """
+    # first line of file is neglected, just names of columns
+    return np.loadtxt(file_name, skiprows=1, dtype=np.float64, ndmin=2)
+
+
+def _npy_name(file_name):
+    """
+    Returns Path of the binary copy of the Nextnano output file made by convert_to_npy
+    """
+    return Path(str(file_name) + '.npy')
+
+
+def convert_to_npy(file_name):
+    """
+    Function reads the Nextnano output file once and saves its data next to it in the .npy format,
+    after that read_data memory-maps the binary copy instead of parsing the text file
+    :param file_name: String adress or Path of the Nextnano output file
+    :return: Path of the saved .npy file
+    """
+    npy_name = _npy_name(file_name)
+    np.save(npy_name, _read_text(file_name))
+    return npy_name
+
+
 def read_data(file_name):
     """
     Function reads the Nextnano output file and returns ndarray of data
-    :param file_name: String adress of the Nextnano output file
+    If the file was converted with convert_to_npy and not changed after that (or deleted),
+    the binary copy is memory-mapped copy-on-write, only the used rows are loaded from disk
+    and changes of the returned array are not written back to the file
+    :param file_name: String adress or Path of the Nextnano output file
     :return: ndarray of data in float format
     """
-    with open(file_name) as data:
-        data.readline()     # neglect first line of file, just names of columns
-        return_data = []
-        for line in data:
-            number_list = []        # list of numbers in one string of file
-            number = ''
-            for letter in line:     # divide line into numbers
-                if not letter.isspace():
-                    number += letter
-                else:
-                    if number:
-                        number_list.append(number)
-                        number = ''
-            return_data.append(number_list)
-        return np.array(return_data, dtype=np.float64)
+    npy_name = _npy_name(file_name)
+    text_name = Path(file_name)
+    if npy_name.exists() and (not text_name.exists() or
+                              npy_name.stat().st_mtime >= text_name.stat().st_mtime):
+        return np.load(npy_name, mmap_mode='c')
+    return _read_text(file_name)
+
+
+def read_data_scaled(file_name, scale=1.0):
+    """
+    Function reads the Nextnano output file and multiplies data by the units transformation coefficient
+    in place, without the additional copy of the data
+    :param file_name: String adress or Path of the Nextnano output file
+    :param scale: float or ndarray with coefficient for every column, e.g. phys_const.ev_to_j
+    :return: ndarray of scaled data in float format
+    """
+    data = read_data(file_name)
+    data *= scale
+    return data
 
 
 def load_el_wave_func2(folder, subband_ind):
@@ -36,9 +72,9 @@ def load_el_wave_func2(folder, subband_ind):
     :param subband_ind: Int number of electron subband index, starting from 1
     :return: ndarray, first column - coordinates, second column - squared wave function in [1/nm] units
     """
-    file_name = folder + '\sg_1band1\cb1_qc1_sg1_deg1_neu_psi_squared.dat'
-    all_data = read_data(file_name)
-    return all_data[:, (0, subband_ind)]
+    file_name = Path(folder) / 'sg_1band1' / 'cb1_qc1_sg1_deg1_neu_psi_squared.dat'
+    all_data = read_data(str(file_name))
+    return all_data[:, [0, subband_ind]]
 
 
 def load_el_mass(folder):
@@ -47,6 +83,6 @@ def load_el_mass(folder):
     :param folder:  String adress of the Nextnano simulation folder
     :return: ndarray, first column - coordinates, second column - effective mass in elementary charge units
     """
-    file_name = folder + '\material_parameters\cb-masses.dat'
-    all_data = read_data(file_name)
-    return all_data[:, (0, 1)]
+    file_name = Path(folder) / 'material_parameters' / 'cb-masses.dat'
+    all_data = read_data(str(file_name))
+    return all_data[:, [0, 1]]
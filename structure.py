@@ -7,6 +7,8 @@ Material database. Contains all the pure and compound semiconductor
 parameters as dictionaries.
 PURESEM - all pure semiconductors (group IV, III-V and others)
 BINALLOY - all alloy semiconductors from two components (IV/IV, III-V/III-V)
+PURESEM_ARR - PURESEM as a NumPy structured array for the batched_... functions,
+NAME_TO_IDX gives the row of the material, material classes use PURESEM directly
 
 *****************************************************************
 Names for the material parameters in the database:
@@ -70,10 +72,18 @@ References:
     Appl. Phys. Lett. 72, 2011 (1998); doi: 10.1063/1.121249
 """
 
+from types import MappingProxyType
+
+import numpy as np
 import matplotlib.pyplot as plt
 
 import equat, phys_const
 
+try:
+    from equat_numba import alloy_band as _alloy_band_jit
+except ImportError:     # numba is not installed, NumPy version is used
+    _alloy_band_jit = None
+
 # Material database, you can define new materials here
 PURESEM = {
     'GaAs': {'lat': 5.65325, 'lat_temp': 3.88e-5,   # lattice constant, temperature coefficient
@@ -107,12 +117,94 @@ BINALLOY = {
                }
 }
 
+# Material database as a structured array: one row per material of PURESEM,
+# one column per parameter, for batched evaluation over many materials
+MATERIAL_DTYPE = np.dtype([('lat', 'f8'), ('lat_temp', 'f8'),
+                           ('VBen', 'f8'), ('VBSO', 'f8'),
+                           ('BGGen', 'f8'), ('BGGa', 'f8'), ('BGGb', 'f8'),
+                           ('BGLen', 'f8'), ('BGLa', 'f8'), ('BGLb', 'f8'),
+                           ('BGXen', 'f8'), ('BGXa', 'f8'), ('BGXb', 'f8'),
+                           ('CBGdeg', 'i8'), ('CBLdeg', 'i8'), ('CBXdeg', 'i8'),
+                           ('CBGmass', 'f8', (3,)), ('CBLmass', 'f8', (3,)), ('CBXmass', 'f8', (3,)),
+                           ('Lutting', 'f8', (3,))
+                           ])
+
+
+def build_material_array(database):
+    """
+    Converts material database dictionary to the structured array
+    database - dictionary of materials in PURESEM format
+    returns (array with MATERIAL_DTYPE, dictionary of material name to row index)
+    Parameters missing in the database are set to NaN (0 for the degeneracies)
+    """
+    arr = np.zeros(len(database), dtype=MATERIAL_DTYPE)
+    for field in MATERIAL_DTYPE.names:
+        if MATERIAL_DTYPE[field].base.kind == 'f':
+            arr[field] = np.nan
+    name_to_idx = {}
+    for idx, (name, param) in enumerate(database.items()):
+        name_to_idx[name] = idx
+        for field in MATERIAL_DTYPE.names:
+            if field in param:
+                arr[idx][field] = param[field]
+    return arr, name_to_idx
+
+
+# rebuild with build_material_array if new materials are added to PURESEM at runtime
+PURESEM_ARR, NAME_TO_IDX = build_material_array(PURESEM)
+
+
+def batched_BGG(indices, temp=300.0):
+    """Returns Gamma band gaps for materials with given row indices of PURESEM_ARR,
+    indices and temp [K] must have broadcast-compatible shapes (e.g. scalar temp, temp of
+    the same length as indices, or indices[:, None] against 1d temp for the (M, T) grid),
+    use equat.varshni_many with the PURESEM_ARR columns for the grid of 1d arrays"""
+    return equat.varshni(temp, PURESEM_ARR['BGGen'][indices],
+                         PURESEM_ARR['BGGa'][indices], PURESEM_ARR['BGGb'][indices])
+
+
+def batched_BGL(indices, temp=300.0):
+    """Returns L band gaps for materials with given row indices of PURESEM_ARR,
+    indices and temp [K] must have broadcast-compatible shapes (e.g. scalar temp, temp of
+    the same length as indices, or indices[:, None] against 1d temp for the (M, T) grid),
+    use equat.varshni_many with the PURESEM_ARR columns for the grid of 1d arrays"""
+    return equat.varshni(temp, PURESEM_ARR['BGLen'][indices],
+                         PURESEM_ARR['BGLa'][indices], PURESEM_ARR['BGLb'][indices])
+
+
+def batched_BGX(indices, temp=300.0):
+    """Returns X band gaps for materials with given row indices of PURESEM_ARR,
+    indices and temp [K] must have broadcast-compatible shapes (e.g. scalar temp, temp of
+    the same length as indices, or indices[:, None] against 1d temp for the (M, T) grid),
+    use equat.varshni_many with the PURESEM_ARR columns for the grid of 1d arrays"""
+    return equat.varshni(temp, PURESEM_ARR['BGXen'][indices],
+                         PURESEM_ARR['BGXa'][indices], PURESEM_ARR['BGXb'][indices])
+
+
+def _alloy_band(x, en1, en2, bow, shift):
+    """Returns band energy position of the alloy with bowing for the content x (float or array),
+    arrays are evaluated by the parallel Numba kernel if numba is installed"""
+    if np.ndim(x) == 0:
+        return x * en1 + (1 - x) * en2 - x * (1 - x) * bow + shift
+    x = np.asarray(x, dtype=np.float64)
+    if _alloy_band_jit is not None:
+        return _alloy_band_jit(x.ravel(), en1, en2, bow, shift).reshape(x.shape)
+    return x * en1 + (1 - x) * en2 - x * (1 - x) * bow + shift
+
+
 # Material classes
 class Mater_Pure():
     """
     Contains all the material parameters for pure semiconductors
     """
 
+    __slots__ = ('name', '_defaults', '_param', '_vben', '_vbso', '_enshift',
+                 '_bgg', '_bgl', '_bgx',
+                 '_cbgmass', '_bgg_cache', '_bgl_cache', '_bgx_cache',
+                 '_temp', '_bgg_at_T', '_bgl_at_T', '_bgx_at_T')
+
+    CACHE_SIZE = 16     # maximum number of temperatures stored for each band gap
+
     def __init__(self, matname, overwrite={}):
         """
         Loads semiconductor parameters from the semiconductor database
@@ -123,79 +215,119 @@ class Mater_Pure():
         material parameters from the database. All bands can be shifted
         with the EnShift key in overwrite
         """
-        self.name = matname  # default material parameters
+        self.name = matname
+        self._defaults = PURESEM[matname]  # default material parameters
+        self._temp = 300.0  # temperature of the band gaps returned by default
         self.param = overwrite  # overwrite default parameters
 
+    @property
+    def param(self):
+        """Read-only view of the parameters which overwrites default,
+        assign a new dictionary to param to change them"""
+        return MappingProxyType(self._param)
+
+    @param.setter
+    def param(self, overwrite):
+        """Sets new overwrite parameters, resolves band parameters and clears cached band gaps"""
+        overwrite = dict(overwrite)     # own copy, later changes of the caller's dictionary are not used
+        self._param = overwrite
+
+        # band parameters are resolved once, accessors only read attributes
+        default = self._defaults
+        self._vben = overwrite.get('VBen', default.get('VBen'))
+        self._vbso = overwrite.get('VBSO', default.get('VBSO'))
+        self._enshift = overwrite.get('EnShift', 0.0)
+        # Varshni parameters (energy, alpha, beta) of the band gaps
+        self._bgg = tuple(overwrite.get(key, default.get(key)) for key in ('BGGen', 'BGGa', 'BGGb'))
+        self._bgl = tuple(overwrite.get(key, default.get(key)) for key in ('BGLen', 'BGLa', 'BGLb'))
+        self._bgx = tuple(overwrite.get(key, default.get(key)) for key in ('BGXen', 'BGXa', 'BGXb'))
+        self._cbgmass = overwrite.get('CBGmass', default.get('CBGmass'))
+        self._bgg_cache = {}
+        self._bgl_cache = {}
+        self._bgx_cache = {}
+        self.bind_temperature(self._temp)
+
+    def _cached_gap(self, cache, temp, varshni_param):
+        """Returns band gap from the cache for the scalar temperature or
+        calculates it with Varshni equation, arrays of temperatures are not cached"""
+        if np.ndim(temp) != 0:
+            return equat.varshni(temp, *varshni_param)
+        try:
+            return cache[temp]
+        except KeyError:
+            if len(cache) >= self.CACHE_SIZE:
+                cache.clear()
+            cache[temp] = eg = equat.varshni(temp, *varshni_param)
+            return eg
+
+    def bind_temperature(self, temp):
+        """Sets temperature [K] of the band gaps and CB positions returned when
+        no temperature is given, each band gap is calculated once on its first use"""
+        self._temp = temp
+        self._bgg_at_T = None
+        self._bgl_at_T = None
+        self._bgx_at_T = None
+
     def VBH(self):
         """Returns heavy hole valence band energy position"""
-        return (self.param.get('VBen', PURESEM[self.name].get('VBen')) +
-                self.param.get('EnShift', 0.0)
-                )
+        return self._vben + self._enshift
 
     def VBL(self):
         """Returns light hole valence band energy position"""
-        return (self.param.get('VBen', PURESEM[self.name].get('VBen')) +
-                self.param.get('EnShift', 0.0)
-                )
+        return self._vben + self._enshift
 
     def VBSO(self):
         """Returns energy position  of the spin-orbit splitted valence band"""
-        return (self.param.get('VBen', PURESEM[self.name].get('VBen')) -
-                self.param.get('VBSO', PURESEM[self.name].get('VBSO')) +
-                self.param.get('EnShift', 0.0)
-                )
-
-    def BGG(self, temp=300.0):
-        """Returns band gap for the Gamma conduction band to valence band"""
-
-        eg = equat.varshni(temp,
-                           self.param.get('BGGen', PURESEM[self.name].get('BGGen')),
-                           self.param.get('BGGa', PURESEM[self.name].get('BGGa')),
-                           self.param.get('BGGb', PURESEM[self.name].get('BGGb')),
-                           )
-        return eg
-
-    def BGL(self, temp=300.0):
-        """Returns band gap for the L conduction band to valence band"""
-
-        eg = equat.varshni(temp,
-                           self.param.get('BGLen', PURESEM[self.name].get('BGLen')),
-                           self.param.get('BGLa', PURESEM[self.name].get('BGLa')),
-                           self.param.get('BGLb', PURESEM[self.name].get('BGLb')),
-                           )
-        return eg
-
-    def BGX(self, temp=300.0):
-        """Returns band gap for the X conduction band to valence band"""
-
-        eg = equat.varshni(temp,
-                           self.param.get('BGXen', PURESEM[self.name].get('BGXen')),
-                           self.param.get('BGXa', PURESEM[self.name].get('BGXa')),
-                           self.param.get('BGXb', PURESEM[self.name].get('BGXb')),
-                           )
-        return eg
-
-    def CBG(self, temp=300.0):
+        return self._vben - self._vbso + self._enshift
+
+    def BGG(self, temp=None):
+        """Returns band gap for the Gamma conduction band to valence band
+        temp - temperature [K], bound temperature (300 K by default) if not given"""
+        if temp is None:
+            if self._bgg_at_T is None:
+                self._bgg_at_T = self._cached_gap(self._bgg_cache, self._temp, self._bgg)
+            return self._bgg_at_T
+        return self._cached_gap(self._bgg_cache, temp, self._bgg)
+
+    def BGL(self, temp=None):
+        """Returns band gap for the L conduction band to valence band
+        temp - temperature [K], bound temperature (300 K by default) if not given"""
+        if temp is None:
+            if self._bgl_at_T is None:
+                self._bgl_at_T = self._cached_gap(self._bgl_cache, self._temp, self._bgl)
+            return self._bgl_at_T
+        return self._cached_gap(self._bgl_cache, temp, self._bgl)
+
+    def BGX(self, temp=None):
+        """Returns band gap for the X conduction band to valence band
+        temp - temperature [K], bound temperature (300 K by default) if not given"""
+        if temp is None:
+            if self._bgx_at_T is None:
+                self._bgx_at_T = self._cached_gap(self._bgx_cache, self._temp, self._bgx)
+            return self._bgx_at_T
+        return self._cached_gap(self._bgx_cache, temp, self._bgx)
+
+    def CBG(self, temp=None):
         """Returns Gamma conduction band position"""
 
-        return (self.VBH() + self.BGG())
+        return (self.VBH() + self.BGG(temp))
 
-    def CBL(self, temp=300.0):
+    def CBL(self, temp=None):
         """Returns L conduction band position"""
 
-        return (self.VBH() + self.BGL())
+        return (self.VBH() + self.BGL(temp))
 
-    def CBX(self, temp=300.0):
+    def CBX(self, temp=None):
         """Returns X conduction band position"""
 
-        return (self.VBH() + self.BGX())
+        return (self.VBH() + self.BGX(temp))
 
     def mg(self):
         """Returns Gamma conduction band mass (without nonparabolicity)
         currently the (100) mass is returned
         To add: orientation dependent mass tensor"""
 
-        return self.param.get('CBGmass', PURESEM[self.name].get('CBGmass'))
+        return self._cbgmass
 
     def cbg_eff_dens(self, temp=300.0):
         """Returns effective density of states of Gamma conduction band"""
@@ -220,35 +352,63 @@ class Mater_Alloy_Double():
         parameters for component semiconductors 1 and 2
         """
         self.name = matname
-        self.mat1 = Mater_Pure(BINALLOY[self.name]['sem'][0], ovrwrt1)
-        self.mat2 = Mater_Pure(BINALLOY[self.name]['sem'][1], ovrwrt2)
+        self._defaults = BINALLOY[matname]      # default alloy parameters
+        self.mat1 = Mater_Pure(self._defaults['sem'][0], ovrwrt1)
+        self.mat2 = Mater_Pure(self._defaults['sem'][1], ovrwrt2)
         self.param = overwrite
 
+    @property
+    def param(self):
+        """Read-only view of the parameters which overwrites default,
+        assign a new dictionary to param to change them"""
+        return MappingProxyType(self._param)
+
+    @param.setter
+    def param(self, overwrite):
+        """Sets new overwrite parameters and resolves bowing and band shift"""
+        overwrite = dict(overwrite)     # own copy, later changes of the caller's dictionary are not used
+        self._param = overwrite
+        self._vbbow = overwrite.get('VBbow', self._defaults.get('VBbow', 0.0))
+        self._vben = overwrite.get('VBen')
+        self._enshift = overwrite.get('EnShift', 0.0)
+        self._bggbow = overwrite.get('BGGbow', self._defaults.get('BGGbow', 0.0))
+
     def VBH(self, x):
         """Returns heavy hole valence band energy position for the alloy with
-        the given content"""
-
-        mean_VB = (x * self.mat1.VBH() + (1 - x) * self.mat2.VBH() -
-                   x * (1 - x) * self.param.get('VBbow', BINALLOY[self.name].get('VBbow', 0.0))
-                   )
+        the given content, x can be float or array (ndarray of the same shape is returned)"""
 
-        return (self.param.get('VBen', mean_VB) +
-                self.param.get('EnShift', 0.0)
-                )
+        if self._vben is not None:
+            vb = self._vben + self._enshift
+            return np.full(np.shape(x), vb) if np.ndim(x) else vb
+        return _alloy_band(x, self.mat1.VBH(), self.mat2.VBH(), self._vbbow, self._enshift)
 
     def CBG(self, x):
-        """Returns Gamma CB energy position for the alloy with the given x"""
+        """Returns Gamma CB energy position for the alloy with the given x,
+        x can be float or array (ndarray of the same shape is returned)
+        CB position is the VB position (VBH) plus the bowed Gamma band gap,
+        band gaps of the components are taken at their bound temperatures (300 K by default)"""
+
+        return self.VBH(x) + _alloy_band(x, self.mat1.BGG(), self.mat2.BGG(), self._bggbow, 0.0)
+
+    def CBG_grid(self, x, temp):
+        """Returns Gamma CB energy positions for the grid of alloy contents x
+        and temperatures temp [K] as ndarray of shape (len(x), len(temp)),
+        scalar x or temp are treated as arrays of one element
+        VB positions (VBH) and band gaps of the components are both read at call time"""
 
-        mean_CBG = (x * self.mat1.CBG() + (1 - x) * self.mat2.CBG() -
-                    x * (1 - x) * self.param.get('VBbow', BINALLOY[self.name].get('VBbow', 0.0))
-                    )
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))[:, None]
+        temp = np.atleast_1d(np.asarray(temp, dtype=np.float64))[None, :]
+        vb = self.VBH(x)   # reads current VBH of the components
+        bg1 = self.mat1.BGG(temp)  # arrays of temperatures are not cached
+        bg2 = self.mat2.BGG(temp)
+        return vb + x * bg1 + (1 - x) * bg2 - x * (1 - x) * self._bggbow
 
 
 if __name__ == '__main__':
     GaAs = Mater_Pure('GaAs')
     AlGaAs = Mater_Alloy_Double('AlGaAs', {'EnShift': 0.0})
-    xes = [i * 0.1 for i in range(11)]
-    vb = [AlGaAs.VBH(x) for x in xes]
+    xes = np.linspace(0, 1, 11)
+    vb = AlGaAs.VBH(xes)
     #plt.plot(xes, vb)
     #plt.show()
     print(GaAs.cbg_eff_dens())